@@ -2,11 +2,15 @@ import praw
 import pandas as pd
 import datetime as dt
 import os
-import re
+import functools
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import nltk
-from nltk.corpus import stopwords
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # ----------------------------------------------------
 # CONFIGURAÇÃO DE CAMINHO GLOBAL
@@ -23,62 +27,135 @@ if not os.path.exists(DATA_DIR):
 # 1. FUNÇÕES DE SUPORTE
 # ----------------------------------------------------
 
+# Recursos do NLTK e os caminhos (relativos a cada pasta de dados) que os indicam
+NLTK_RESOURCES = {
+    'vader_lexicon': ('sentiment/vader_lexicon', 'sentiment/vader_lexicon.zip'),
+}
+# Se definido, NLTK_DATA também é o destino dos downloads (senão, o padrão do NLTK)
+NLTK_DATA_DIR = os.environ.get('NLTK_DATA', '').split(os.pathsep)[0] or None
+_NLTK_READY = False
+
+def _nltk_resource_exists(paths):
+    """Verifica direto no disco se o recurso existe em alguma pasta de nltk.data.path."""
+    return any(os.path.exists(os.path.join(data_dir, path))
+               for data_dir in nltk.data.path for path in paths)
+
 def download_nltk_resources():
     """Garante que todos os recursos do NLTK estejam instalados."""
-    try:
-        nltk.data.find('corpora/stopwords')
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('sentiment/vader_lexicon')
-        nltk.data.find('tokenizers/punkt_tab')
+    global _NLTK_READY
+    if _NLTK_READY:
+        return
+
+    missing = [name for name, paths in NLTK_RESOURCES.items() if not _nltk_resource_exists(paths)]
+    if not missing:
         print("Recursos do NLTK já instalados.")
-    except LookupError:
-        print("Baixando recursos necessários do NLTK...")
-        nltk.download('stopwords')
-        nltk.download('punkt')
-        nltk.download('vader_lexicon')
-        nltk.download('punkt_tab')
-
-def preprocess_text(text):
-    """Limpa o texto para a análise de sentimento."""
-    text = text.lower()
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'@\w+', '', text)
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    tokens = nltk.word_tokenize(text)
-    
-    stop_words_pt = set(stopwords.words('portuguese'))
-    stop_words_en = set(stopwords.words('english'))
-    
-    filtered_tokens = [word for word in tokens if word not in stop_words_pt and word not in stop_words_en and len(word) > 1]
-    
-    return ' '.join(filtered_tokens)
-
-def classify_sentiment(score):
-    """Classifica o score de sentimento em Positivo, Negativo ou Neutro."""
-    if score >= 0.05:
-        return 'Positivo'
-    elif score <= -0.05:
-        return 'Negativo'
     else:
-        return 'Neutro'
+        print("Baixando recursos necessários do NLTK...")
+        for name in missing:
+            nltk.download(name, download_dir=NLTK_DATA_DIR)
+    _NLTK_READY = True
+
+# O léxico precisa existir antes de montar o analisador global abaixo
+download_nltk_resources()
+
+# Analisador reutilizado a cada comentário: carregado uma única vez
+_ANALYZER = SentimentIntensityAnalyzer()
+
+# Esquema do arquivo bruto de comentários, gravado em lotes durante a coleta
+_RAW_COMMENTS_SCHEMA = pa.schema([
+    ('post_id', pa.string()),
+    ('comment_id', pa.string()),
+    ('text', pa.string()),
+    ('comment_score', pa.int64()),
+    ('date', pa.float64()),  # created_utc bruto; convertido de uma vez após a coleta
+])
+_RAW_BATCH_SIZE = 1000
+
+# O PRAW não é thread-safe: cada thread da coleta de comentários usa sua própria
+# instância de praw.Reddit (sessão, rate limiter e token próprios). Como o limite
+# de requisições da API vale por aplicação, poucas threads já bastam.
+_COMMENT_FETCH_WORKERS = 8
+_thread_local = threading.local()
+
+# Limites de tamanho para evitar o pior caso de desempenho do VADER
+_VADER_MAX_CHARS = 10_000
+_VADER_MAX_SPACES = 2000
+
+@functools.lru_cache(maxsize=65536)
+def _vader_compound(text):
+    """Retorna apenas o score 'compound' do VADER para o texto bruto do comentário."""
+    # Textos gigantes podem travar o VADER por minutos: tratados como neutros
+    if len(text) > _VADER_MAX_CHARS or text.count(' ') > _VADER_MAX_SPACES:
+        return 0.0
+    return _ANALYZER.polarity_scores(text)['compound']
+
+def classify_sentiment(scores):
+    """Classifica os scores de sentimento em Positivo, Negativo ou Neutro (vetorizado)."""
+    score = np.asarray(scores)
+    return np.select([score >= 0.05, score <= -0.05], ['Positivo', 'Negativo'], default='Neutro')
+
+def _init_reddit_thread(reddit_kwargs):
+    """Cria a instância de praw.Reddit exclusiva da thread atual."""
+    _thread_local.reddit = praw.Reddit(**reddit_kwargs)
+
+def _fetch_comments(submission_id):
+    """Expande e coleta os comentários de um post (executado em threads)."""
+    submission = _thread_local.reddit.submission(id=submission_id)
+    # **********************************************
+    # CORREÇÃO CRÍTICA DE VELOCIDADE: limit=0 
+    # **********************************************
+    submission.comments.replace_more(limit=0) # Limita a expansão para acelerar
+
+    # Colunas paralelas (uma lista por campo) em vez de um dicionário por comentário
+    post_ids, comment_ids, texts, scores, dates = [], [], [], [], []
+    for comment in submission.comments.list():
+        if comment.author and comment.body:
+            post_ids.append(submission.id)
+            comment_ids.append(comment.id)
+            texts.append(comment.body)
+            scores.append(comment.score)
+            dates.append(comment.created_utc)
+    return {
+        'post_id': post_ids,
+        'comment_id': comment_ids,
+        'text': texts,
+        'comment_score': scores,
+        'date': dates
+    }
+
+def write_daily_aggregates(df_final, daily_file_path):
+    """Grava o score médio, a soma e a contagem de comentários por dia."""
+    df_daily = df_final.groupby('date').agg(
+        score_mean=('sentiment_score', 'mean'),
+        score_sum=('sentiment_score', 'sum'),
+        n=('sentiment_score', 'size')
+    ).reset_index()
+    df_daily.to_parquet(daily_file_path, engine='pyarrow', compression='zstd', index=False)
 
 # ----------------------------------------------------
 # 2. FUNÇÃO PRINCIPAL DE COLETA E ANÁLISE POR TEMA
 # ----------------------------------------------------
 
-def run_analysis_for_theme(search_term):
-    """Executa a coleta, análise de sentimento e salva o arquivo final para um dado termo."""
+def run_analysis_for_theme(search_term, num_workers=None):
+    """Executa a coleta, análise de sentimento e salva o arquivo final para um dado termo.
+
+    num_workers limita o pool de pontuação do VADER (None = todos os núcleos).
+    """
     
     # 2.1. CONFIGURAÇÃO DE ARQUIVO
     
     safe_term = search_term.replace(' ', '_').replace('(', '').replace(')', '')
-    data_file_name = f'reddit_{safe_term}_analisado.csv'
+    data_file_name = f'reddit_{safe_term}_analisado.parquet'
     full_file_path = os.path.join(DATA_DIR, data_file_name) 
+    daily_file_path = os.path.join(DATA_DIR, f'reddit_{safe_term}_daily.parquet')
 
     print(f"\n====================== INICIANDO TEMA: {search_term} ======================")
 
     if os.path.exists(full_file_path):
+        if not os.path.exists(daily_file_path):
+            # Arquivo de análise de uma execução anterior (ou interrompida) sem os agregados
+            print(f"Gerando agregados diários a partir de '{data_file_name}'...")
+            write_daily_aggregates(pd.read_parquet(full_file_path, columns=['date', 'sentiment_score']), daily_file_path)
         print(f"Arquivo '{data_file_name}' já existe. Pulando a coleta e análise.")
         return
 
@@ -94,10 +171,11 @@ def run_analysis_for_theme(search_term):
         CLIENT_ID, CLIENT_SECRET, USERNAME, PASSWORD = creds[:4]
         USER_AGENT = f'Python script for {search_term} analysis by /u/Data-Science-Project'
 
-        reddit = praw.Reddit(
+        reddit_kwargs = dict(
             client_id=CLIENT_ID, client_secret=CLIENT_SECRET,
             username=USERNAME, password=PASSWORD, user_agent=USER_AGENT
         )
+        reddit = praw.Reddit(**reddit_kwargs)
         print("Conexão com o Reddit estabelecida.")
     except Exception as e:
         print(f"ERRO DE AUTENTICAÇÃO: Verifique o arquivo credentials.txt em {credentials_path}. Detalhes: {e}")
@@ -105,64 +183,81 @@ def run_analysis_for_theme(search_term):
 
     # 2.3. COLETA DE DADOS (PRAW)
     posts_data = []
-    comments_data = []
+    comments_batch = {name: [] for name in _RAW_COMMENTS_SCHEMA.names}
+    total_comments = 0
+    raw_file_path = full_file_path.replace('.parquet', '.raw.parquet')
     
     SUBREDDITS = 'gaming+xboxone+PS5+NintendoSwitch+playstation' 
     
     print(f"Buscando por '{search_term}' em r/{SUBREDDITS} (100 posts)...")
     
-    for submission in reddit.subreddit(SUBREDDITS).search(search_term, limit=100):
-        if not submission.stickied:
-            # Coleta de Post
-            posts_data.append({
-                'post_id': submission.id,
-                'title': submission.title,
-                'score': submission.score,
-                'url': submission.url,
-                'created_utc': dt.datetime.fromtimestamp(submission.created_utc)
-            })
-            
-            # Coleta de Comentários
-            # **********************************************
-            # CORREÇÃO CRÍTICA DE VELOCIDADE: limit=0 
-            # **********************************************
-            submission.comments.replace_more(limit=0) # Limita a expansão para acelerar
-            for comment in submission.comments.list():
-                if comment.author and comment.body:
-                    comments_data.append({
-                        'post_id': submission.id,
-                        'comment_id': comment.id,
-                        'comment_text': comment.body,
-                        'comment_score': comment.score,
-                        'created_utc': dt.datetime.fromtimestamp(comment.created_utc)
-                    })
+    # Posts fixados (stickied) já ficam de fora da lista entregue à coleta paralela
+    submissions = list(itertools.islice(
+        (s for s in reddit.subreddit(SUBREDDITS).search(search_term, limit=100) if not s.stickied),
+        100
+    ))
+
+    for submission in submissions:
+        # Coleta de Post
+        posts_data.append({
+            'post_id': submission.id,
+            'title': submission.title,
+            'score': submission.score,
+            'url': submission.url,
+            'created_utc': dt.datetime.fromtimestamp(submission.created_utc)
+        })
+
+    # Coleta de Comentários: as requisições de cada post são feitas em paralelo
+    # e os comentários vão para o disco em lotes, sem acumular tudo na memória
+    with ThreadPoolExecutor(max_workers=_COMMENT_FETCH_WORKERS,
+                            initializer=_init_reddit_thread, initargs=(reddit_kwargs,)) as executor, \
+            pq.ParquetWriter(raw_file_path, _RAW_COMMENTS_SCHEMA) as writer:
+        for comments in executor.map(_fetch_comments, [s.id for s in submissions]):
+            for name, values in comments.items():
+                comments_batch[name].extend(values)
+            if len(comments_batch['post_id']) >= _RAW_BATCH_SIZE:
+                writer.write_batch(pa.RecordBatch.from_pydict(comments_batch, schema=_RAW_COMMENTS_SCHEMA))
+                total_comments += len(comments_batch['post_id'])
+                comments_batch = {name: [] for name in _RAW_COMMENTS_SCHEMA.names}
+        if comments_batch['post_id']:
+            writer.write_batch(pa.RecordBatch.from_pydict(comments_batch, schema=_RAW_COMMENTS_SCHEMA))
+            total_comments += len(comments_batch['post_id'])
     
-    if not comments_data:
+    if not total_comments:
         print(f"AVISO: Nenhuma informação de comentário encontrada para '{search_term}'. Pulando a análise.")
+        os.remove(raw_file_path)
         return
 
-    df_comments = pd.DataFrame(comments_data)
-    df_comments.rename(columns={'comment_text': 'text', 'created_utc': 'date'}, inplace=True)
+    # Com os comentários em memória o arquivo bruto já não é necessário; removê-lo aqui
+    # evita que uma falha na análise deixe o '.raw.parquet' para trás
+    df_comments = pd.read_parquet(raw_file_path)
+    os.remove(raw_file_path)
+    # Conversão vetorizada dos timestamps (segundos UTC) para datas
+    df_comments['date'] = pd.to_datetime(df_comments['date'], unit='s').dt.normalize()
     df = df_comments.dropna(subset=['text'])
 
 
     # 2.4. ANÁLISE DE SENTIMENTO
     print(f"Analisando {len(df)} comentários...")
     
-    # Pré-processamento
-    df['cleaned_text'] = df['text'].astype(str).apply(preprocess_text)
-
-    # VADER
-    analyzer = SentimentIntensityAnalyzer()
-    df['sentiment_score'] = df['cleaned_text'].apply(lambda x: analyzer.polarity_scores(x)['compound'])
-    df['sentiment'] = df['sentiment_score'].apply(classify_sentiment)
+    # VADER sobre o texto bruto: pontuação, maiúsculas, negações e emojis são sinais
+    # que ele usa, então não há pré-processamento antes da pontuação
+    # (ProcessPoolExecutor permite criar processos a partir dos workers de tema)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        df['sentiment_score'] = list(executor.map(_vader_compound, df['text'].astype(str).tolist(), chunksize=64))
+    df['sentiment'] = classify_sentiment(df['sentiment_score'].to_numpy())
 
     # 2.5. SALVAMENTO DO ARQUIVO FINAL
-    df_final = df[['post_id', 'date', 'text', 'cleaned_text', 'sentiment_score', 'sentiment', 'comment_score']]
-    df_final['date'] = pd.to_datetime(df_final['date']).dt.normalize()
+    df_final = df[['post_id', 'date', 'text', 'sentiment_score', 'sentiment', 'comment_score']]
+    df_final['date'] = df_final['date'].astype('datetime64[ns]')
+
+    # AGREGADOS DIÁRIOS PRÉ-CALCULADOS (usados no gráfico de tendência do dashboard)
+    # Gravados antes do arquivo principal: se a gravação falhar, o tema não é dado
+    # como concluído e a próxima execução refaz tudo
+    write_daily_aggregates(df_final, daily_file_path)
 
-    # SALVAMENTO USANDO O CAMINHO E SEPARADOR CORRETO
-    df_final.to_csv(full_file_path, index=False, sep=';')
+    # SALVAMENTO EM PARQUET (leitura mais rápida no dashboard e datas já tipadas)
+    df_final.to_parquet(full_file_path, engine='pyarrow', compression='zstd', index=False)
 
     print(f"Fase 3: Análise Concluída para {search_term}.")
     print(f"Arquivo final salvo em '{full_file_path}'.")
@@ -172,8 +267,8 @@ def run_analysis_for_theme(search_term):
 # ----------------------------------------------------
 if __name__ == '__main__':
     
-    # 1. Configurar NLTK antes de tudo
-    download_nltk_resources()
+    # 1. Recursos do NLTK já configurados na importação do módulo
+    #    (o processo pai baixa tudo antes de criar os processos filhos)
     
     # 2. Temas escolhidos
     temas_para_analisar = [
@@ -182,9 +277,15 @@ if __name__ == '__main__':
         'Nintendo Switch Online'
     ]
     
-    # 3. Executar o processo para cada tema
-    for tema in temas_para_analisar:
-        run_analysis_for_theme(tema)
+    # 3. Executar o processo para cada tema em paralelo (um processo por tema)
+    #    Os núcleos são divididos entre os temas para não criar temas × núcleos workers
+    num_processos = min(len(temas_para_analisar), os.cpu_count() or 1)
+    workers_por_tema = max(1, (os.cpu_count() or 1) // num_processos)
+    with ProcessPoolExecutor(max_workers=num_processos) as executor:
+        list(executor.map(
+            functools.partial(run_analysis_for_theme, num_workers=workers_por_tema),
+            temas_para_analisar
+        ))
 
     print("\n===================================================")
     print("TODAS AS ANÁLISES CONCLUÍDAS. TENTE EXECUTAR O DASHBOARD NOVAMENTE!")
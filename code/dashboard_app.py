@@ -12,6 +12,10 @@ AVAILABLE_THEMES = [
     'Nintendo Switch Online'
 ]
 
+# Colunas lidas do arquivo de análise e seus tipos em memória
+DASHBOARD_COLUMNS = ['post_id', 'date', 'text', 'sentiment_score', 'sentiment', 'comment_score']
+DASHBOARD_DTYPES = {'sentiment': 'category', 'sentiment_score': 'float32', 'comment_score': 'int32'}
+
 # ----------------------------------------------------
 # 1. CONFIGURAÇÃO DA PÁGINA E SELEÇÃO DO TEMA
 # ----------------------------------------------------
@@ -30,7 +34,7 @@ selected_theme = st.sidebar.selectbox(
 )
 
 safe_theme = selected_theme.replace(' ', '_').replace('(', '').replace(')', '')
-data_file_name = f'reddit_{safe_theme}_analisado.csv'
+data_file_name = f'reddit_{safe_theme}_analisado.parquet'
 
 
 # ----------------------------------------------------
@@ -44,12 +48,59 @@ def load_data(file_path):
     data_dir = os.path.join(os.path.dirname(current_dir), 'Data')
     absolute_file_path = os.path.join(data_dir, file_path)
     
-    df = pd.read_csv(absolute_file_path, sep=';')
-    
-    # CORREÇÃO DO FILTRO DE DATA: Normaliza para 00:00:00, mantendo o tipo datetime
-    df['date'] = pd.to_datetime(df['date']).dt.normalize()
+    # A coluna 'date' já vem do Parquet como datetime normalizado (00:00:00)
+    # Só as colunas usadas no dashboard, com tipos mais compactos
+    df = pd.read_parquet(absolute_file_path, columns=DASHBOARD_COLUMNS).astype(DASHBOARD_DTYPES)
+
+    # Índice de datas ordenado: o filtro por período vira uma busca binária
+    df = df.sort_values('date').set_index('date', drop=False).rename_axis(None)
     return df
 
+@st.cache_data
+def load_daily_data(file_path):
+    """Carrega os agregados diários gerados na coleta (score médio, soma e contagem por dia)."""
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(os.path.dirname(current_dir), 'Data')
+    daily_file_path = os.path.join(data_dir, file_path.replace('_analisado.parquet', '_daily.parquet'))
+
+    if os.path.exists(daily_file_path):
+        df_daily = pd.read_parquet(daily_file_path, columns=['date', 'score_sum', 'n'])
+    else:
+        # Sem o arquivo de agregados, recalcula a partir do arquivo de análise
+        df_daily = load_data(file_path).groupby('date', observed=True)['sentiment_score'].agg(
+            score_sum='sum', n='size'
+        ).reset_index()
+    return df_daily.sort_values('date').set_index('date', drop=False).rename_axis(None)
+
+# Sem datas, o período considerado é a base inteira
+def _filter(df, start_date=None, end_date=None):
+    """Retorna os comentários dentro do período selecionado."""
+    # Sem cache: a fatia do índice é mais barata que copiar o DataFrame do cache
+    if start_date is None or end_date is None:
+        return df
+    return df.loc[start_date:end_date]
+
+# Só os resultados agregados (pequenos) ficam em cache, indexados pelo arquivo e período
+@st.cache_data(max_entries=64)
+def _distribuicao(file_path, start_date=None, end_date=None):
+    """Percentual de cada sentimento no período selecionado."""
+    df = _filter(load_data(file_path), start_date, end_date)
+    # Com 'sentiment' categórico, um período vazio devolve NaN para cada categoria
+    return df['sentiment'].value_counts(normalize=True).fillna(0).mul(100).round(1)
+
+@st.cache_data(max_entries=64)
+def _tendencia(file_path, start_date=None, end_date=None):
+    """Score de sentimento médio por dia no período selecionado."""
+    df_daily = load_daily_data(file_path)
+    if start_date is not None and end_date is not None:
+        df_daily = df_daily.loc[start_date:end_date]
+    # Média ponderada reconstruída a partir das somas e contagens diárias
+    return pd.DataFrame({
+        'date': df_daily['date'],
+        'sentiment_score': df_daily['score_sum'] / df_daily['n']
+    }).reset_index(drop=True)
+
 try:
     df_analise = load_data(data_file_name)
     total_comentarios = len(df_analise)
@@ -71,14 +122,11 @@ try:
     if len(date_range) == 2:
         start_date = pd.to_datetime(date_range[0])
         end_date = pd.to_datetime(date_range[1])
-        
-        # Filtro com comparação direta entre objetos datetime
-        df_filtered = df_analise[
-            (df_analise['date'] >= start_date) & 
-            (df_analise['date'] <= end_date) 
-        ]
     else:
-        df_filtered = df_analise
+        start_date = end_date = None
+
+    # Filtro por fatia do índice de datas ordenado (limites inclusivos)
+    df_filtered = _filter(df_analise, start_date, end_date)
 
 
     # ----------------------------------------------------
@@ -89,7 +137,7 @@ try:
     st.markdown("---")
 
     comentarios_filtrados = len(df_filtered)
-    distribuicao_sentimento = df_filtered['sentiment'].value_counts(normalize=True).mul(100).round(1)
+    distribuicao_sentimento = _distribuicao(data_file_name, start_date, end_date)
 
     col1, col2, col3 = st.columns(3)
 
@@ -133,8 +181,8 @@ try:
     # ----------------------------------------------------
     st.header("Tendência Diária do Sentimento")
     
-    # CORREÇÃO: Agrupa diretamente pela coluna 'date' (que já é datetime)
-    df_tendencia = df_filtered.groupby('date')['sentiment_score'].mean().reset_index()
+    # Usa os agregados diários pré-calculados na coleta
+    df_tendencia = _tendencia(data_file_name, start_date, end_date)
 
     fig_line = px.line(
         df_tendencia,
@@ -166,7 +214,7 @@ try:
 
     with col_pos:
         st.subheader("🟢 Top 10 Comentários Positivos")
-        df_top_pos = df_filtered.sort_values(by='sentiment_score', ascending=False).head(10)
+        df_top_pos = df_filtered.nlargest(10, 'sentiment_score')
         df_top_pos_display = df_top_pos[['text', 'sentiment_score', 'comment_score']]
         df_top_pos_display.columns = ['Comentário', 'Score de Sentimento', 'Upvotes (Score Reddit)']
         st.dataframe(df_top_pos_display, height=350, use_container_width=True)
@@ -174,7 +222,7 @@ try:
 
     with col_neg:
         st.subheader("🔴 Top 10 Comentários Negativos")
-        df_top_neg = df_filtered.sort_values(by='sentiment_score', ascending=True).head(10)
+        df_top_neg = df_filtered.nsmallest(10, 'sentiment_score')
         df_top_neg_display = df_top_neg[['text', 'sentiment_score', 'comment_score']]
         df_top_neg_display.columns = ['Comentário', 'Score de Sentimento', 'Upvotes (Score Reddit)']
         st.dataframe(df_top_neg_display, height=350, use_container_width=True)